@@ -1,8 +1,13 @@
 import simpy
 import time
+from contextlib import nullcontext
 from queue import Queue
+from time import perf_counter
 from colorama import init, Fore
 
+from instrumentation import EngineStats
+from retention import KeepAll
+
 # initialize colorama
 init(autoreset=True)
 
@@ -14,33 +19,62 @@ This program is to simulate inserting jobs into memory blocks in a fixed partiti
 # Memory Simulator Class
 # --------------------------
 class MemorySimulator:
-    def __init__(self, jobs, memory):
+    def __init__(self, jobs, memory, step_delay=1, verbose=True, retention=None, exporter=None, paging=None):
+        # jobs is either a list of job dicts or a re-iterable stream such as
+        # workload.WorkloadGenerator; streams are released at their arrival_time
         self.original_jobs = jobs
         self.original_memory = memory
+        self.step_delay = step_delay  # seconds slept per finished job, for visualization
+        self.verbose = verbose
+        # decides which finished-job records stay resident (see retention.py)
+        self.completed = retention if retention is not None else KeepAll()
+        # per-phase timings and counters; off by default (see instrumentation.py)
+        self.stats = EngineStats()
+        # optional export.ResultsExporter for per-job and time-series columns
+        self.exporter = exporter
+        # optional paging.PagingSimulator; jobs with 'pages' run their references on it
+        self.paging = paging
         self.reset_memory()
         self.env = None
         self.current_time = 0
-        self.completed_jobs = []
         self.metrics = MemorySimulatorMetrics()
 
     # Allocation strategies
     def first_fit(self, job):
         # 1. check the memory status to see if there is any available memory block that can fit the job size.
-        for block in self.memory:
-            if block['status'] == 'free' and block['size'] >= job['size']:
-                self.allocate_memory(job, block)
-                return block
-        print(Fore.RED + f"Job {job['stream']} of size {job['size']} cannot be allocated.")
-        return None
+        start = perf_counter() if self.stats.enabled else None
+        block, scanned = self.scan_blocks(self.memory, job)
+        if start is not None:
+            self.record_fit(start, scanned, block)
+        if block is None:
+            self.log(Fore.RED, f"Job {job['stream']} of size {job['size']} cannot be allocated.")
+            return None
+        self.allocate_memory(job, block)
+        return block
 
     def best_fit(self, job):
         #  sort the memory block in ascending order based on their sizes.
-        for block in sorted(self.memory, key=lambda x: x['size']):
+        start = perf_counter() if self.stats.enabled else None
+        block, scanned = self.scan_blocks(sorted(self.memory, key=lambda x: x['size']), job)
+        if start is not None:
+            self.record_fit(start, scanned, block)
+        if block is None:
+            self.log(Fore.RED, f"Job {job['stream']} of size {job['size']} cannot be allocated.")
+            return None
+        self.allocate_memory(job, block)
+        return block
+
+    def scan_blocks(self, blocks, job):
+        """Returns the first free block that fits the job and how many blocks were looked at"""
+        for scanned, block in enumerate(blocks, 1):
             if block['status'] == 'free' and block['size'] >= job['size']:
-                self.allocate_memory(job, block)
-                return block
-        print(Fore.RED + f"Job {job['stream']} of size {job['size']} cannot be allocated.")
-        return None
+                return block, scanned
+        return None, len(blocks)
+
+    def record_fit(self, start, scanned, block):
+        self.stats.record('fit_search', perf_counter() - start)
+        self.stats.count('blocks_scanned', scanned)
+        self.stats.count('allocations' if block is not None else 'failed_allocations')
 
     # Core memory operations
     def allocate_memory(self, job, block):
@@ -52,27 +86,52 @@ class MemorySimulator:
         if 'queue_entry_time' in job:  # calculate wait time if job came from queue
             wait_time = self.env.now - job['queue_entry_time']
             job['wait_time'] = wait_time
-            print(Fore.GREEN + f"Job {job['stream']} allocated to Block {block['block']} (waste={size_wasted}, waited {wait_time}).")
+            self.log(Fore.GREEN, f"Job {job['stream']} allocated to Block {block['block']} (waste={size_wasted}, waited {wait_time}).")
         else:
-            print(Fore.GREEN + f"Job {job['stream']} allocated to Block {block['block']} (waste={size_wasted}).")
+            self.log(Fore.GREEN, f"Job {job['stream']} allocated to Block {block['block']} (waste={size_wasted}).")
 
         job['status'] = 'running'
         job['allocated_block'] = block['block']
-        self.metrics.job_started()
+        job['start_time'] = self.env.now
+        job['waste'] = size_wasted
+        self.used_memory += job['size']
+        self.total_fragmentation += size_wasted
+        self.running_jobs += 1
+        if self.exporter is not None:
+            self.record_sample()
+        if self.stats.enabled:
+            start = perf_counter()
+            self.metrics.job_started()
+            self.stats.record('metrics', perf_counter() - start)
+        else:
+            self.metrics.job_started()
 
     def deallocate_memory(self, block):
         # free space in memory 
         finished_job = block['job']
+        self.used_memory -= finished_job['size']
+        self.total_fragmentation -= block['internal_fragmentation']
+        self.running_jobs -= 1
         block['status'] = 'free'
         block['job'] = None
         block['internal_fragmentation'] = 0
-        print(Fore.CYAN + f"Job {finished_job['stream']} finished. Block {block['block']} is now free.")
+        self.log(Fore.CYAN, f"Job {finished_job['stream']} finished. Block {block['block']} is now free.")
         finished_job['status'] = 'completed'
-        self.completed_jobs.append(finished_job)
+        finished_job['finish_time'] = self.env.now
+        self.completed.add(finished_job)
+        if self.exporter is not None:
+            self.exporter.add_job(finished_job)
+            self.record_sample()
 
         # update metrics
         wait_time = finished_job.get('wait_time', 0)
-        self.metrics.job_completed(wait_time)
+        if self.stats.enabled:
+            start = perf_counter()
+            self.metrics.job_completed(wait_time)
+            self.stats.record('metrics', perf_counter() - start)
+            self.stats.count('deallocations')
+        else:
+            self.metrics.job_completed(wait_time)
 
         self.free_waiting_queue()
 
@@ -82,9 +141,16 @@ class MemorySimulator:
         Jobs that cant go in memory go here
         """
         job['queue_entry_time'] = self.env.now  # record queue entry time
-        print(Fore.YELLOW + f"Job {job['stream']} of size {job['size']} added to waiting queue at t={self.env.now}.")
+        self.log(Fore.YELLOW, f"Job {job['stream']} of size {job['size']} added to waiting queue at t={self.env.now}.")
         job['status'] = 'queued'
         self.waiting_jobs.put(job)
+        if self.exporter is not None:
+            self.record_sample()
+
+    def record_sample(self):
+        total = self.total_memory or 1
+        self.exporter.observe(self.env.now, self.used_memory / total, self.total_fragmentation / total,
+                              self.waiting_jobs.qsize(), self.running_jobs)
 
     def free_waiting_queue(self):
         """
@@ -93,20 +159,26 @@ class MemorySimulator:
         if self.waiting_jobs.empty():
             return
 
+        start = perf_counter() if self.stats.enabled else None
+        retries = 0
         for _ in range(self.waiting_jobs.qsize()):
             job = self.waiting_jobs.get()
-            for block in self.memory:
-                if block['status'] == 'free' and block['size'] >= job['size']:
-                    self.allocate_memory(job, block)
-                    print(Fore.MAGENTA + f"Job {job['stream']} allocated from waiting queue to block {block['block']} at t={self.env.now}.")
-                    break
-            else:
+            retries += 1
+            block, _ = self.scan_blocks(self.memory, job)
+            if block is None:
                 self.waiting_jobs.put(job)
-                print(Fore.RED + f"Job {job['stream']} remains in waiting queue.")
+                self.log(Fore.RED, f"Job {job['stream']} remains in waiting queue.")
                 break
+            self.allocate_memory(job, block)
+            self.env.process(self.run_job(self.env, job, block))
+            self.log(Fore.MAGENTA, f"Job {job['stream']} allocated from waiting queue to block {block['block']} at t={self.env.now}.")
+        if start is not None:
+            self.stats.record('queue_retry', perf_counter() - start)
+            self.stats.count('queue_retries', retries)
 
     # Simulation processes
     def job_process(self, env, job, strategy="first_fit"):
+        job['enter_time'] = env.now
         if strategy == "first_fit":
             b = self.first_fit(job)
         else:
@@ -115,28 +187,141 @@ class MemorySimulator:
         if b is None:
             self.waiting_queue(job)
         else:
-            yield env.timeout(job['time'])
-            time.sleep(1)  # slow down for visualization
-            self.deallocate_memory(b)
+            yield from self.run_job(env, job, b)
+
+    def run_job(self, env, job, block):
+        if self.paging is not None and 'pages' in job:
+            self.paging.run_stream(job['stream'], job['pages'])
+        yield env.timeout(job['time'])
+        if self.step_delay:
+            if self.stats.enabled:
+                start = perf_counter()
+                time.sleep(self.step_delay)  # slow down for visualization
+                self.stats.record('pacing', perf_counter() - start)
+            else:
+                time.sleep(self.step_delay)  # slow down for visualization
+        self.deallocate_memory(block)
+
+    def arrival_process(self, env, strategy="first_fit"):
+        """
+        Releases streamed jobs at their arrival times, one at a time, so the
+        workload is never materialized as a list
+        """
+        for job in self.original_jobs:
+            job['status'] = 'waiting'
+            job['wait_time'] = 0
+            job['allocated_block'] = None
+            delay = job['arrival_time'] - env.now
+            if delay > 0:
+                yield env.timeout(delay)
+            env.process(self.job_process(env, job, strategy))
+
+    def start_jobs(self, strategy):
+        if self.streaming:
+            self.env.process(self.arrival_process(self.env, strategy))
+        else:
+            for job in self.jobs:
+                self.env.process(self.job_process(self.env, job, strategy))
+
+    # Incremental driving, used by multipool shards
+    def submit_job(self, job, strategy="first_fit"):
+        """Adds one job to the running environment, released at its arrival_time"""
+        if self.env is None:
+            self.env = simpy.Environment()
+        job['status'] = 'waiting'
+        job['wait_time'] = 0
+        job['allocated_block'] = None
+        self.env.process(self.release_job(self.env, job, strategy))
+
+    def release_job(self, env, job, strategy):
+        delay = job.get('arrival_time', 0) - env.now
+        if delay > 0:
+            yield env.timeout(delay)
+        yield from self.job_process(env, job, strategy)
+
+    def run_until(self, until=None):
+        """Advances simulated time to `until` (or until no events remain when None)"""
+        if self.env is None:
+            self.env = simpy.Environment()
+        if until is None:
+            self.env.run()
+        elif until > self.env.now:
+            self.env.run(until=until)
+        self.current_time = self.env.now
 
     def run_simulation(self, strategy):
         self.env = simpy.Environment()
-        for job in self.jobs:
-            self.env.process(self.job_process(self.env, job, strategy))
-        self.env.run()
-        print(Fore.CYAN + "Simulation finished.")
+        self.finalized = False
+        self.start_jobs(strategy)
+        with self.stats.profiler or nullcontext():
+            if self.stats.enabled:
+                # step manually so every event is timed and counted
+                while self.env.peek() != simpy.core.Infinity:
+                    self.timed_step()
+            else:
+                self.env.run()
+        self.finalize()
+        self.log(Fore.CYAN, "Simulation finished.")
 
     # Step-based simulation for frontend
     def simulate_step(self, strategy="first_fit"):
         if self.env is None:
             self.env = simpy.Environment()
-            for job in self.jobs:
-                self.env.process(self.job_process(self.env, job, strategy))
+            self.start_jobs(strategy)
         if not self.env.peek() == simpy.core.Infinity:
-            self.env.step()
+            if self.stats.profiler is not None and not self.finalized:
+                # one sampling thread for the whole stepped run, stopped by
+                # finalize(), reset_memory() or stats.disable_profiler()
+                self.stats.profiler.start()
+            if self.stats.enabled:
+                self.timed_step()
+            else:
+                self.env.step()
             self.current_time = self.env.now
+        if self.is_finished():
+            self.finalize()
+
+    def finalize(self):
+        # flush retained records and exports once per run, however often the
+        # frontend keeps stepping after the end
+        if self.finalized:
+            return
+        self.finalized = True
+        if self.stats.profiler is not None:
+            self.stats.profiler.stop()
+        self.completed.flush()
+        if self.exporter is not None:
+            self.exporter.finish(self.env.now)
+
+    def timed_step(self):
+        start = perf_counter()
+        self.env.step()
+        self.stats.record('scheduling', perf_counter() - start)
+        self.stats.count('events')
+
+    def is_finished(self):
+        """
+        True once every job has completed, or nothing is left to schedule
+        (e.g. the remaining jobs are too large for any block). Uses counters
+        only, so it stays O(1) however long the trace is.
+        """
+        if self.env is None:
+            return False
+        if not self.streaming and self.metrics.completed_jobs >= len(self.jobs):
+            return True
+        return self.env.peek() == simpy.core.Infinity
 
     # Helpers
+    def log(self, color, message):
+        if not self.verbose:
+            return
+        if self.stats.enabled:
+            start = perf_counter()
+            print(color + message)
+            self.stats.record('logging', perf_counter() - start)
+        else:
+            print(color + message)
+
     def print_memory(self):
         print("\n=== Memory Status ===")
         for block in self.memory:
@@ -146,16 +331,32 @@ class MemorySimulator:
 
     def reset_memory(self):
         self.memory = [dict(block) for block in self.original_memory]
-        self.jobs = [dict(job) for job in self.original_jobs]
+        # streamed workloads are re-drawn from the generator on every run
+        self.streaming = not isinstance(self.original_jobs, (list, tuple))
+        self.jobs = [] if self.streaming else [dict(job) for job in self.original_jobs]
         for job in self.jobs:
             job['status'] = 'waiting'
             job['wait_time'] = 0
             job['allocated_block'] = None
         self.waiting_jobs = Queue()
-        self.completed_jobs = []
+        self.completed.reset()
+        if self.exporter is not None:
+            self.exporter.reset()
+        if self.paging is not None:
+            self.paging.reset()
+        # engine stats describe one run, like the metrics below
+        if self.stats.profiler is not None:
+            self.stats.profiler.stop()
+        self.stats.reset()
+        # running totals so utilization does not need a pass over every block
+        self.total_memory = sum(block['size'] for block in self.memory)
+        self.used_memory = 0
+        self.total_fragmentation = 0
+        self.running_jobs = 0
         self.metrics = MemorySimulatorMetrics()
         self.env = None
         self.current_time = 0
+        self.finalized = False
 
     # Frontend-friendly getters
     def get_memory_state(self):
@@ -165,19 +366,26 @@ class MemorySimulator:
         return self.jobs
 
     def get_completed_jobs(self):
-        return self.completed_jobs
+        # only the records kept by the retention policy; counts are in get_metrics()
+        return self.completed.jobs()
 
     def get_waiting_jobs(self):
         return list(self.waiting_jobs.queue)
 
+    def get_engine_stats(self):
+        return self.stats.snapshot()
+
     def get_metrics(self):
-        return {
+        metrics = {
             "throughput": self.metrics.get_throughput(),
             "avg_wait_time": self.metrics.get_average_waiting_time(),
             "waiting_queue_size": self.metrics.get_waiting_queue_size(),
             "completed_jobs": self.metrics.completed_jobs,
             "total_jobs": self.metrics.total_jobs
         }
+        if self.paging is not None:
+            metrics["paging"] = self.paging.get_metrics()
+        return metrics
 
 # --------------------------
 #calculating metrics
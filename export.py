@@ -0,0 +1,124 @@
+import json
+import os
+
+import numpy as np
+
+from retention import ColumnWriter, load_columns
+
+'''
+Columnar bulk export of simulation results.
+
+ResultsExporter is attached to a MemorySimulator and writes two tables, each
+as one append-only .npy file per column (see retention.ColumnWriter):
+
+* jobs/        - one row per finished job: block, wait, turnaround, waste, ...
+* timeseries/  - utilization, fragmentation and queue depth sampled every
+                 `sample_interval` units of simulated time
+
+Rows are buffered and written in batches. np.load(..., mmap_mode='r') (or
+load_results) maps the columns without parsing anything, and each column is a
+plain contiguous little-endian buffer that Arrow can wrap without copying.
+'''
+
+JOB_COLUMNS = {
+    'stream': np.int64,
+    'size': np.int64,
+    'time': np.float64,
+    'arrival_time': np.float64,
+    'enter_time': np.float64,
+    'start_time': np.float64,
+    'finish_time': np.float64,
+    'allocated_block': np.int64,
+    'wait_time': np.float64,
+    'turnaround': np.float64,
+    'waste': np.int64,
+}
+
+TIMESERIES_COLUMNS = {
+    'time': np.float64,
+    'utilization': np.float64,
+    'fragmentation': np.float64,
+    'queue_depth': np.int64,
+    'running_jobs': np.int64,
+}
+
+
+class ResultsExporter:
+    def __init__(self, directory, sample_interval=1.0, batch_size=65536):
+        if sample_interval <= 0:
+            raise ValueError("sample_interval must be positive")
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.jobs = ColumnWriter(os.path.join(directory, 'jobs'), JOB_COLUMNS, batch_size)
+        self.timeseries = ColumnWriter(os.path.join(directory, 'timeseries'), TIMESERIES_COLUMNS, batch_size)
+        self.reset()
+
+    def reset(self):
+        self.jobs.truncate()
+        self.timeseries.truncate()
+        self.samples = 0  # sample k is taken at k * sample_interval
+        self.state = (0.0, 0.0, 0, 0)
+
+    # Per-job outcomes
+    def add_job(self, job):
+        row = dict(job)
+        row['turnaround'] = job['finish_time'] - job.get('enter_time', 0)
+        self.jobs.append(row)
+
+    # Time series
+    def observe(self, now, utilization, fragmentation, queue_depth, running_jobs):
+        """
+        Called after every state change. The state is constant between changes,
+        so every sample point passed since the previous change gets the
+        previous state.
+        """
+        if now >= self.samples * self.sample_interval:
+            self.emit_samples(now, inclusive=False)
+        self.state = (utilization, fragmentation, queue_depth, running_jobs)
+
+    def emit_samples(self, until, inclusive):
+        last = int(until // self.sample_interval)
+        if not inclusive and last * self.sample_interval >= until:
+            last -= 1
+        utilization, fragmentation, queue_depth, running_jobs = self.state
+        while self.samples <= last:
+            # a long quiet gap is written in slices of at most batch_size rows
+            end = min(last, self.samples + self.timeseries.batch_size - 1)
+            count = end - self.samples + 1
+            if count == 1:
+                # the common case: one sample point between two state changes
+                self.timeseries.append({'time': self.samples * self.sample_interval, 'utilization': utilization, 'fragmentation': fragmentation,
+                                        'queue_depth': queue_depth, 'running_jobs': running_jobs})
+            else:
+                self.timeseries.append_columns({
+                    'time': self.sample_interval * np.arange(self.samples, end + 1),
+                    'utilization': np.full(count, utilization),
+                    'fragmentation': np.full(count, fragmentation),
+                    'queue_depth': np.full(count, queue_depth),
+                    'running_jobs': np.full(count, running_jobs),
+                })
+            self.samples = end + 1
+
+    def finish(self, now):
+        """Writes the remaining samples up to `now` and flushes everything to disk"""
+        self.emit_samples(now, inclusive=True)
+        self.flush()
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump({
+                'sample_interval': self.sample_interval,
+                'end_time': now,
+                'jobs': {'rows': self.jobs.rows, 'columns': list(JOB_COLUMNS)},
+                'timeseries': {'rows': self.timeseries.rows, 'columns': list(TIMESERIES_COLUMNS)},
+            }, f, indent=2)
+
+    def flush(self):
+        self.jobs.flush()
+        self.timeseries.flush()
+
+
+def load_results(directory):
+    """Memory-maps an exported run: {'jobs': {column: array}, 'timeseries': {column: array}}"""
+    return {
+        'jobs': load_columns(os.path.join(directory, 'jobs'), JOB_COLUMNS),
+        'timeseries': load_columns(os.path.join(directory, 'timeseries'), TIMESERIES_COLUMNS),
+    }
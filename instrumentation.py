@@ -0,0 +1,229 @@
+import bisect
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+'''
+Engine instrumentation for MemorySimulator.
+
+EngineStats collects per-phase timing histograms and counters while enabled.
+The simulator checks `stats.enabled` once per operation and skips all timing
+when it is off, so a disabled instance costs one attribute lookup per call.
+
+Phases:
+* fit_search   - scanning blocks in first_fit / best_fit
+* queue_retry  - retrying the waiting queue after a deallocation
+* scheduling   - SimPy event processing (includes the phases it triggers)
+* metrics      - MemorySimulatorMetrics updates
+* logging      - console output (only when verbose)
+* pacing       - step_delay sleeps for visualization (inside scheduling)
+
+events_per_second is engine throughput: events over the time spent in
+scheduling minus pacing. Time between steps (the GUI's speed slider) and
+step_delay sleeps are not engine time.
+'''
+
+PHASES = ('fit_search', 'queue_retry', 'scheduling', 'metrics', 'logging', 'pacing')
+COUNTERS = ('allocations', 'failed_allocations', 'blocks_scanned', 'deallocations', 'queue_retries', 'events')
+
+# histogram upper bounds in seconds: 1us, 2us, 4us ... ~1s, then +Inf
+BUCKETS = [1e-6 * 2 ** k for k in range(21)]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else 0,
+            'buckets': {repr(bound): n for bound, n in zip(BUCKETS + [float('inf')], self.counts)},
+        }
+
+
+# --------------------------
+# Sampling profiler
+# A daemon thread samples the profiled thread's stack every `interval` seconds;
+# samples are aggregated as collapsed stacks (flamegraph format). Use it as a
+# context manager around the code to profile, or call start() from the thread
+# to profile and stop() when done; stop() joins the sampling thread.
+# --------------------------
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.target = None
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        """Starts sampling the calling thread; a no-op if it is already being sampled"""
+        target = threading.get_ident()
+        if self.thread is not None and self.target == target:
+            return
+        self.stop()
+        self.target = target
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.sample_loop, args=(self.stopping,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+
+    def sample_loop(self, stopping):
+        while not stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return dict(self.samples)
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+# --------------------------
+# Engine stats
+# --------------------------
+class EngineStats:
+    def __init__(self, enabled=False):
+        self.profiler = None
+        self.reset()
+        self.enabled = enabled
+
+    def enable(self):
+        if not self.enabled:
+            self.started = time.perf_counter()
+        self.enabled = True
+
+    def disable(self):
+        if self.enabled:
+            self.active_seconds += time.perf_counter() - self.started
+        self.enabled = False
+
+    def reset(self):
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # wall time spent enabled; events are only counted while enabled
+        self.active_seconds = 0.0
+        self.started = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.samples.clear()
+
+    def enable_profiler(self, interval=0.005):
+        self.disable_profiler()
+        self.profiler = SamplingProfiler(interval)
+        return self.profiler
+
+    def disable_profiler(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+        self.profiler = None
+
+    # Recording (callers check self.enabled first)
+    def record(self, phase, seconds):
+        self.histograms[phase].observe(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    # Reporting
+    def elapsed(self):
+        """Seconds spent enabled since the last reset, summed over enable/disable periods"""
+        if self.enabled:
+            return self.active_seconds + time.perf_counter() - self.started
+        return self.active_seconds
+
+    def engine_seconds(self):
+        """Seconds spent processing events, excluding step_delay pacing"""
+        return max(0.0, self.histograms['scheduling'].total - self.histograms['pacing'].total)
+
+    def snapshot(self):
+        c = self.counters
+        elapsed = self.elapsed()
+        engine = self.engine_seconds()
+        return {
+            'enabled': self.enabled,
+            'elapsed_seconds': elapsed,
+            'engine_seconds': engine,
+            'counters': dict(c),
+            'blocks_scanned_per_allocation': c['blocks_scanned'] / (c['allocations'] + c['failed_allocations'])
+            if c['allocations'] + c['failed_allocations'] else 0,
+            'queue_retries_per_deallocation': c['queue_retries'] / c['deallocations'] if c['deallocations'] else 0,
+            'events_per_second': c['events'] / engine if engine > 0 else 0,
+            'events_per_wall_second': c['events'] / elapsed if elapsed > 0 else 0,
+            'phases': {phase: h.to_dict() for phase, h in self.histograms.items()},
+        }
+
+    def to_json(self, path):
+        snapshot = self.snapshot()
+        if self.profiler is not None:
+            snapshot['profile'] = self.profiler.collapsed()
+        with open(path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+
+    def to_prometheus(self, path, prefix='memsim'):
+        """Writes the Prometheus text exposition format (e.g. for the node_exporter textfile collector)"""
+        lines = [
+            f"# HELP {prefix}_phase_seconds Time spent per simulator phase.",
+            f"# TYPE {prefix}_phase_seconds histogram",
+        ]
+        for phase, h in self.histograms.items():
+            cumulative = 0
+            for bound, n in zip(BUCKETS + [float('inf')], h.counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {h.total!r}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {h.count}')
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        lines.append(f"# TYPE {prefix}_events_per_second gauge")
+        lines.append(f"{prefix}_events_per_second {self.snapshot()['events_per_second']!r}")
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def summary_lines(self):
+        """Short human-readable lines for the GUI metrics panel"""
+        s = self.snapshot()
+        lines = [
+            f"• Engine events/sec: {s['events_per_second']:,.0f}",
+            f"• Blocks scanned/alloc: {s['blocks_scanned_per_allocation']:.2f}",
+            f"• Queue retries/dealloc: {s['queue_retries_per_deallocation']:.2f}",
+        ]
+        for phase, h in s['phases'].items():
+            if h['count']:
+                lines.append(f"• {phase}: {h['mean'] * 1e6:,.1f} us avg x {h['count']:,}")
+        return lines
@@ -3,9 +3,9 @@ from queue import Queue
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QGridLayout, QPushButton, QLabel, 
                             QComboBox, QTableWidget, QTableWidgetItem, QTextEdit,
-                            QListWidget, QSlider, QGroupBox,
+                            QListWidget, QSlider, QGroupBox, QCheckBox,
                             QSplitter, QFrame, QScrollArea)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QPalette, QColor
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -14,6 +14,7 @@ import numpy as np
 
 # === import backend simulator (constructor requires jobs, memory) ===
 from backend import MemorySimulator as BackendMemorySimulator
+from sharedsim import RemoteSimulator
 
 
 # --------------------------
@@ -199,8 +200,8 @@ class SimulationWorker(QThread):
             self.update_signal.emit()
             self.msleep(int(1000 / self.speed))
             
-            # stop when all jobs completed
-            if len(self.simulator.get_completed_jobs()) >= len(self.simulator.get_jobs_state()):
+            # stop when all jobs completed (counter based, see MemorySimulator.is_finished)
+            if self.simulator.is_finished():
                 break
         
         self.running = False
@@ -214,14 +215,27 @@ class SimulationWorker(QThread):
 # MAIN WINDOW (Frontend)
 # =================================================================
 class MainWindow(QMainWindow):
-    def __init__(self):
+    FRAME_INTERVAL_MS = 33  # ~30 fps repaint polling in out-of-process mode
+
+    def __init__(self, out_of_process=False):
         super().__init__()
         # === instantiate backend with required args ===
-        self.simulator = BackendMemorySimulator(ORIGINAL_JOBS, ORIGINAL_MEMORY)
+        # out_of_process: simulation runs in its own process and the GUI reads
+        # its state from shared memory at its own frame rate (see sharedsim.py)
+        self.out_of_process = out_of_process
+        if out_of_process:
+            self.simulator = RemoteSimulator(ORIGINAL_JOBS, ORIGINAL_MEMORY)
+        else:
+            self.simulator = BackendMemorySimulator(ORIGINAL_JOBS, ORIGINAL_MEMORY)
         self.worker = None
         self.memory_blocks_widgets = []
         self.init_ui()
         self.update_display()
+        if out_of_process:
+            self.speed_slider.valueChanged.connect(lambda value: self.simulator.set_speed(value / 10.0))
+            self.frame_timer = QTimer(self)
+            self.frame_timer.timeout.connect(self.poll_remote_state)
+            self.frame_timer.start(self.FRAME_INTERVAL_MS)
     
     def init_ui(self):
         self.setWindowTitle("Fixed Partition Memory Management Simulator")
@@ -337,6 +351,12 @@ class MainWindow(QMainWindow):
         self.time_label.setFont(QFont("Arial", 12, QFont.Bold))
         control_layout.addWidget(self.time_label, 2, 0, 1, 4)
         
+        # Engine instrumentation toggle (in-process backend only)
+        self.engine_stats_check = QCheckBox("Show engine stats")
+        self.engine_stats_check.setEnabled(not self.out_of_process)
+        self.engine_stats_check.toggled.connect(self.toggle_engine_stats)
+        control_layout.addWidget(self.engine_stats_check, 3, 0, 1, 4)
+        
         control_group.setLayout(control_layout)
         layout.addWidget(control_group)
     
@@ -446,6 +466,13 @@ class MainWindow(QMainWindow):
         layout.addWidget(jobs_group)
     
     def start_simulation(self):
+        if self.out_of_process:
+            algo = self.algorithm_combo.currentText()
+            strategy = "first_fit" if "First" in algo else "best_fit"
+            self.simulator.start(strategy, self.speed_slider.value() / 10.0)
+            self.start_btn.setEnabled(False)
+            self.pause_btn.setEnabled(True)
+            return
         if self.worker is None or not self.worker.isRunning():
             # map UI -> backend strategy
             algo = self.algorithm_combo.currentText()
@@ -461,6 +488,11 @@ class MainWindow(QMainWindow):
             self.pause_btn.setEnabled(True)
     
     def pause_simulation(self):
+        if self.out_of_process:
+            self.simulator.pause()
+            self.start_btn.setEnabled(True)
+            self.pause_btn.setEnabled(False)
+            return
         if self.worker and self.worker.isRunning():
             self.worker.stop()
             self.worker.wait()
@@ -473,7 +505,8 @@ class MainWindow(QMainWindow):
         algo = self.algorithm_combo.currentText()
         strategy = "first_fit" if "First" in algo else "best_fit"
         self.simulator.simulate_step(strategy)
-        self.update_display()
+        if not self.out_of_process:  # remote state is repainted by poll_remote_state
+            self.update_display()
     
     def reset_simulation(self):
         if self.worker and self.worker.isRunning():
@@ -482,7 +515,8 @@ class MainWindow(QMainWindow):
         
         # backend reset
         self.simulator.reset_memory()
-        self.update_display()
+        if not self.out_of_process:
+            self.update_display()
         
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
@@ -491,6 +525,27 @@ class MainWindow(QMainWindow):
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
     
+    def toggle_engine_stats(self, checked):
+        if checked:
+            self.simulator.stats.enable()
+        else:
+            self.simulator.stats.disable()
+        self.update_statistics()
+    
+    def poll_remote_state(self):
+        # repaint only when the simulation process has published something new
+        if not self.simulator.refresh():
+            return
+        self.update_display()
+        if self.simulator.is_finished() and not self.start_btn.isEnabled():
+            self.simulation_finished()
+    
+    def closeEvent(self, event):
+        if self.out_of_process:
+            self.frame_timer.stop()
+            self.simulator.close()
+        super().closeEvent(event)
+    
     def update_display(self):
         # Update time (backend keeps current_time)
         self.time_label.setText(f"Current Time: {self.simulator.current_time}")
@@ -561,6 +616,18 @@ WAITING STATISTICS:
 • Avg Wait Time: {avg_wait_time:.2f} units
 """
         
+        paging = metrics.get("paging")
+        if paging is not None:
+            stats_text += f"""
+PAGING ({paging['policy'].upper()}, {paging['frames']} frames):
+• References: {paging['references']:,}
+• Page faults: {paging['page_faults']:,}
+• Hit rate: {paging['hit_rate'] * 100:.1f}%
+"""
+        
+        if self.engine_stats_check.isChecked():
+            stats_text += "\nENGINE:\n" + "\n".join(self.simulator.stats.summary_lines()) + "\n"
+        
         self.stats_text.setPlainText(stats_text)
     
     def update_job_table(self):
@@ -604,7 +671,8 @@ def main():
     palette.setColor(QPalette.WindowText, Qt.black)
     app.setPalette(palette)
     
-    window = MainWindow()
+    # --process runs the simulation out of process (shared-memory state)
+    window = MainWindow(out_of_process='--process' in sys.argv)
     window.show()
     
     sys.exit(app.exec_())
@@ -0,0 +1,319 @@
+import itertools
+import multiprocessing
+
+import numpy as np
+
+from backend import MemorySimulator
+from retention import AggregateOnly
+
+'''
+Multi-pool (NUMA node / host) simulation.
+
+Each memory pool runs as its own MemorySimulator shard, normally in a separate
+process. A router in front places arriving jobs on pools and drives the shards
+in simulated-time lockstep: every epoch it sends each shard one batch of the
+jobs that arrive during the epoch plus the time to advance to, then waits for
+all shards to report back. Placement decisions use the pool state reported at
+the end of the previous epoch, adjusted for jobs the router has already placed
+in the current one.
+'''
+
+JOB_COLUMNS = ('stream', 'time', 'size', 'arrival_time')
+
+
+# --------------------------
+# Shard side
+# Messages are tuples: ('step', columns, until), ('drain',) and ('stop',).
+# Every message gets a status dict back.
+# --------------------------
+def shard_status(sim):
+    free_blocks = [b['size'] for b in sim.memory if b['status'] == 'free']
+    return {
+        'now': sim.env.now,
+        'capacity': sum(b['size'] for b in sim.memory),
+        'used': sum(b['job']['size'] for b in sim.memory if b['status'] == 'occupied'),
+        'fragmentation': sum(b['internal_fragmentation'] for b in sim.memory),
+        'free_blocks': sorted(free_blocks),
+        'max_block': max((b['size'] for b in sim.memory), default=0),
+        'queue': sim.waiting_jobs.qsize(),
+        'total_waiting_time': sim.metrics.total_waiting_time,
+        'idle': sim.env.peek() == float('inf'),
+        **sim.get_metrics(),
+    }
+
+
+class ShardState:
+    """Handles router messages against one in-process MemorySimulator"""
+    def __init__(self, memory, strategy="first_fit"):
+        self.strategy = strategy
+        self.sim = MemorySimulator([], memory, step_delay=0, verbose=False, retention=AggregateOnly())
+        self.sim.run_until(0)
+
+    def handle(self, message):
+        kind = message[0]
+        if kind == 'step':
+            _, columns, until = message
+            values = [columns[key].tolist() for key in JOB_COLUMNS]
+            for stream, duration, size, arrival in zip(*values):
+                job = {'stream': stream, 'time': duration, 'size': size, 'arrival_time': arrival}
+                self.sim.submit_job(job, self.strategy)
+            self.sim.run_until(until)
+        elif kind == 'drain':
+            self.sim.run_until()
+        elif kind != 'stop':
+            raise ValueError(f"unknown shard message {kind!r}")
+        return shard_status(self.sim)
+
+
+def shard_main(conn, memory, strategy):
+    state = ShardState(memory, strategy)
+    while True:
+        message = conn.recv()
+        conn.send(state.handle(message))
+        if message[0] == 'stop':
+            break
+    conn.close()
+
+
+class ProcessShard:
+    def __init__(self, memory, strategy, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=shard_main, args=(child, memory, strategy), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, message):
+        self.conn.send(message)
+
+    def recv(self):
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+        self.process.join()
+
+
+class LocalShard:
+    """Same interface as ProcessShard, evaluated in the router's process"""
+    def __init__(self, memory, strategy):
+        self.state = ShardState(memory, strategy)
+        self.reply = None
+
+    def send(self, message):
+        self.reply = self.state.handle(message)
+
+    def recv(self):
+        return self.reply
+
+    def close(self):
+        pass
+
+
+# --------------------------
+# Placement policies
+# place(job, views) returns the index of the pool that gets the job, or None
+# when no pool has a block large enough to ever hold it. Views are the
+# router's copy of each pool's last status; note_placed() keeps them current
+# between status reports.
+# --------------------------
+def eligible_pools(job, views):
+    # a job queued on a pool whose blocks are all too small would wait forever
+    # and block the shard's FIFO waiting queue behind it
+    return [i for i, view in enumerate(views) if view.max_block >= job['size']]
+
+
+class PoolView:
+    def __init__(self, status):
+        self.status = status
+        self.free_blocks = list(status['free_blocks'])
+        self.max_block = status['max_block']
+        self.pending_size = 0
+        self.pending_jobs = 0
+
+    def load(self):
+        # fraction of the pool that is used or already promised, plus queued work
+        return (self.status['used'] + self.pending_size) / self.status['capacity'] + self.status['queue'] + self.pending_jobs
+
+    def note_placed(self, size):
+        self.pending_size += size
+        fits = [i for i, block in enumerate(self.free_blocks) if block >= size]
+        if fits:
+            self.free_blocks.pop(fits[0])  # free_blocks is sorted, so this is the best fit
+        else:
+            self.pending_jobs += 1
+
+
+class RoundRobin:
+    def __init__(self):
+        self.counter = itertools.count()
+
+    def place(self, job, views):
+        pools = eligible_pools(job, views)
+        if not pools:
+            return None
+        start = next(self.counter) % len(views)
+        # the first eligible pool at or after this job's turn
+        return min(pools, key=lambda i: (i - start) % len(views))
+
+
+class LeastLoaded:
+    def place(self, job, views):
+        pools = eligible_pools(job, views)
+        if not pools:
+            return None
+        return min(pools, key=lambda i: views[i].load())
+
+
+class BestFitAcrossPools:
+    """Smallest free block that fits, over every pool; least-loaded when none fits"""
+    def __init__(self):
+        self.fallback = LeastLoaded()
+
+    def place(self, job, views):
+        best = None
+        for i, view in enumerate(views):
+            if view.max_block < job['size']:
+                continue
+            for block in view.free_blocks:
+                if block >= job['size']:
+                    if best is None or block < best[0]:
+                        best = (block, i)
+                    break
+        if best is None:
+            return self.fallback.place(job, views)
+        return best[1]
+
+
+# --------------------------
+# Router
+# --------------------------
+def job_chunks(jobs, chunk_size=65536):
+    """Yields column batches from a WorkloadGenerator or any iterable of job dicts"""
+    if hasattr(jobs, 'chunks'):
+        yield from jobs.chunks()
+        return
+    iterator = iter(jobs)
+    while True:
+        batch = list(itertools.islice(iterator, chunk_size))
+        if not batch:
+            return
+        yield {
+            'stream': np.array([job['stream'] for job in batch], dtype=np.int64),
+            'time': np.array([job['time'] for job in batch], dtype=float),
+            'size': np.array([job['size'] for job in batch], dtype=np.int64),
+            'arrival_time': np.array([job.get('arrival_time', 0) for job in batch], dtype=float),
+        }
+
+
+class MultiPoolSimulator:
+    """
+    jobs: list of job dicts or a workload.WorkloadGenerator, in arrival order
+    pools: one memory partition list per pool (same shape as ORIGINAL_MEMORY)
+    policy: RoundRobin(), LeastLoaded() or BestFitAcrossPools()
+    epoch: simulated time between router/shard synchronisations
+    processes: False runs every shard in this process (handy for debugging)
+    """
+    def __init__(self, jobs, pools, policy=None, strategy="first_fit", epoch=10.0, processes=True):
+        if not pools:
+            raise ValueError("at least one pool is required")
+        if epoch <= 0:
+            raise ValueError("epoch must be positive")
+        self.jobs = jobs
+        self.pools = pools
+        self.policy = policy if policy is not None else LeastLoaded()
+        self.strategy = strategy
+        self.epoch = epoch
+        self.processes = processes
+        self.statuses = []
+        self.rejected_jobs = 0
+
+    def start_shards(self):
+        if self.processes:
+            context = multiprocessing.get_context()
+            return [ProcessShard(memory, self.strategy, context) for memory in self.pools]
+        return [LocalShard(memory, self.strategy) for memory in self.pools]
+
+    def exchange(self, shards, messages):
+        # send to every shard before waiting, so the shards work in parallel
+        for shard, message in zip(shards, messages):
+            shard.send(message)
+        self.statuses = [shard.recv() for shard in shards]
+
+    def place_batch(self, columns):
+        views = [PoolView(status) for status in self.statuses]
+        targets = np.empty(len(columns['size']), dtype=np.intp)
+        for i, size in enumerate(columns['size'].tolist()):
+            pool = self.policy.place({'size': size}, views)
+            if pool is None:
+                # larger than every block in every pool: reject at the router
+                self.rejected_jobs += 1
+                targets[i] = -1
+                continue
+            views[pool].note_placed(size)
+            targets[i] = pool
+        return [{key: columns[key][targets == pool] for key in JOB_COLUMNS} for pool in range(len(views))]
+
+    def run(self):
+        shards = self.start_shards()
+        self.rejected_jobs = 0
+        try:
+            self.exchange(shards, [('step', {key: np.empty(0) for key in JOB_COLUMNS}, 0)] * len(shards))
+            now = 0.0
+            pending = None
+            for chunk in job_chunks(self.jobs):
+                pending = chunk if pending is None else {key: np.concatenate((pending[key], chunk[key])) for key in JOB_COLUMNS}
+                now, pending = self.step_epochs(shards, now, pending, final=False)
+            if pending is not None:
+                self.step_epochs(shards, now, pending, final=True)
+            self.exchange(shards, [('drain',)] * len(shards))
+            self.exchange(shards, [('stop',)] * len(shards))
+        finally:
+            for shard in shards:
+                shard.close()
+        return self.get_metrics()
+
+    def step_epochs(self, shards, now, pending, final):
+        """
+        Runs whole epochs over `pending` (sorted by arrival_time). Unless this
+        is the final batch, jobs in the last partial epoch are handed back so
+        the next chunk can join them.
+        """
+        arrivals = pending['arrival_time']
+        while len(arrivals):
+            # skip empty stretches instead of stepping through them
+            until = max(now, float(arrivals[0])) + self.epoch
+            cut = int(np.searchsorted(arrivals, until, side='left'))
+            if cut == len(arrivals) and not final:
+                break
+            batch = {key: pending[key][:cut] for key in JOB_COLUMNS}
+            pending = {key: pending[key][cut:] for key in JOB_COLUMNS}
+            arrivals = pending['arrival_time']
+            self.exchange(shards, [('step', columns, until) for columns in self.place_batch(batch)])
+            now = until
+        return now, pending
+
+    def get_metrics(self):
+        pools = []
+        for i, status in enumerate(self.statuses):
+            pools.append({
+                'pool': i,
+                'utilization': status['used'] / status['capacity'] if status['capacity'] else 0,
+                'fragmentation': status['fragmentation'],
+                **{key: status[key] for key in ('throughput', 'avg_wait_time', 'waiting_queue_size',
+                                                'completed_jobs', 'total_jobs', 'queue')},
+            })
+        completed = sum(s['completed_jobs'] for s in self.statuses)
+        total = sum(s['total_jobs'] for s in self.statuses)
+        capacity = sum(s['capacity'] for s in self.statuses)
+        aggregate = {
+            'throughput': completed / total if total else 0,
+            'avg_wait_time': sum(s['total_waiting_time'] for s in self.statuses) / completed if completed else 0,
+            'waiting_queue_size': sum(s['waiting_queue_size'] for s in self.statuses),
+            'completed_jobs': completed,
+            'total_jobs': total,
+            'queue': sum(s['queue'] for s in self.statuses),
+            'rejected_jobs': self.rejected_jobs,
+            'utilization': sum(s['used'] for s in self.statuses) / capacity if capacity else 0,
+            'time': max((s['now'] for s in self.statuses), default=0),
+        }
+        return {'pools': pools, 'aggregate': aggregate}
@@ -0,0 +1,394 @@
+import heapq
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+
+import numpy as np
+
+'''
+Paging / page-replacement simulation, alongside the fixed-partition
+MemorySimulator.
+
+Jobs carry page-reference streams and run against a shared pool of frames
+with FIFO, LRU, Clock, LFU or OPT replacement. References are handled in
+NumPy batches: each batch is run-length compressed first (an immediate
+re-reference is a hit under every policy), so the per-reference Python loop
+only sees page changes. Streams can be arrays, memory-mapped arrays or
+iterables of chunks, so long traces run in bounded memory. OPT is the
+exception: it needs the future, so it works on whole in-memory traces.
+
+A PagingSimulator can also be attached to MemorySimulator (paging=...): jobs
+that carry 'pages' run their references when they start, and the paging
+metrics appear in MemorySimulator.get_metrics()['paging'].
+'''
+
+NEVER = np.iinfo(np.int64).max  # next-use position of a page that is not referenced again
+JOB_SHIFT = 32  # global page id = (stream << JOB_SHIFT) | page
+
+
+def global_pages(stream, pages):
+    """Packs a job's local page numbers into global page ids, rejecting values that would collide"""
+    if not 0 <= stream < 1 << (63 - JOB_SHIFT):
+        raise ValueError(f"stream {stream} out of range for paging (0 <= stream < 2**{63 - JOB_SHIFT})")
+    if len(pages) and (pages.min() < 0 or pages.max() >= 1 << JOB_SHIFT):
+        raise ValueError(f"page numbers of stream {stream} must be in [0, 2**{JOB_SHIFT})")
+    return pages + (stream << JOB_SHIFT)
+
+
+def compress_runs(pages):
+    """Collapses consecutive repeats: returns (distinct pages, run lengths, run end positions)"""
+    n = len(pages)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    np.not_equal(pages[1:], pages[:-1], out=change[1:])
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], n) - 1
+    return pages[starts], ends - starts + 1, ends
+
+
+def next_use(pages):
+    """For each position, the position of the next reference to the same page (NEVER if none)"""
+    order = np.argsort(pages, kind='stable')
+    ordered = pages[order]
+    result = np.full(len(pages), NEVER, dtype=np.int64)
+    same = ordered[1:] == ordered[:-1]
+    result[order[:-1][same]] = order[1:][same]
+    return result
+
+
+# --------------------------
+# Replacement policies
+# process(pages, counts, ends) takes one run-compressed batch and returns the
+# number of page faults. State carries over between batches.
+# --------------------------
+class FIFOPolicy:
+    def __init__(self, frames):
+        self.frames = frames
+        self.resident = set()
+        self.order = deque()
+
+    def process(self, pages, counts, ends):
+        resident, order, frames = self.resident, self.order, self.frames
+        faults = 0
+        for page in pages.tolist():
+            if page in resident:
+                continue
+            faults += 1
+            if len(resident) >= frames:
+                resident.discard(order.popleft())
+            resident.add(page)
+            order.append(page)
+        return faults
+
+
+class LRUPolicy:
+    """O(1) per reference: an OrderedDict is a hash map threaded on a linked list"""
+    def __init__(self, frames):
+        self.frames = frames
+        self.resident = OrderedDict()
+
+    def process(self, pages, counts, ends):
+        resident, frames = self.resident, self.frames
+        touch = resident.move_to_end
+        faults = 0
+        for page in pages.tolist():
+            if page in resident:
+                touch(page)
+                continue
+            faults += 1
+            if len(resident) >= frames:
+                resident.popitem(last=False)
+            resident[page] = None
+        return faults
+
+
+class ClockPolicy:
+    """Second chance: the hand clears reference bits until it finds a clear one"""
+    def __init__(self, frames):
+        self.frames = frames
+        self.slots = [None] * frames
+        self.referenced = bytearray(frames)
+        self.slot_of = {}
+        self.hand = 0
+
+    def process(self, pages, counts, ends):
+        slots, referenced, slot_of, frames = self.slots, self.referenced, self.slot_of, self.frames
+        hand = self.hand
+        faults = 0
+        for page in pages.tolist():
+            slot = slot_of.get(page)
+            if slot is not None:
+                referenced[slot] = 1
+                continue
+            faults += 1
+            if len(slot_of) < frames:
+                slot = len(slot_of)
+            else:
+                while referenced[hand]:
+                    referenced[hand] = 0
+                    hand = (hand + 1) % frames
+                slot = hand
+                del slot_of[slots[slot]]
+                hand = (hand + 1) % frames
+            slots[slot] = page
+            slot_of[page] = slot
+            referenced[slot] = 1
+        self.hand = hand
+        return faults
+
+
+class LFUPolicy:
+    """
+    Least frequently used, ties broken by least recently used. Pages sit in
+    per-frequency buckets, so hits are O(1); a min-heap of bucket frequencies
+    finds the eviction bucket. A run of repeated references adds its whole
+    length to the page's count.
+    """
+    def __init__(self, frames):
+        self.frames = frames
+        self.frequency = {}
+        self.buckets = {}
+        self.bucket_heap = []  # bucket frequencies, with stale entries skipped lazily
+
+    def process(self, pages, counts, ends):
+        frequency, buckets, bucket_heap, frames = self.frequency, self.buckets, self.bucket_heap, self.frames
+        faults = 0
+        for page, count in zip(pages.tolist(), counts.tolist()):
+            current = frequency.get(page)
+            if current is not None:
+                bucket = buckets[current]
+                del bucket[page]
+                if not bucket:
+                    del buckets[current]
+                count += current
+            else:
+                faults += 1
+                if len(frequency) >= frames:
+                    while bucket_heap[0] not in buckets:
+                        heapq.heappop(bucket_heap)
+                    lowest = bucket_heap[0]
+                    bucket = buckets[lowest]
+                    victim, _ = bucket.popitem(last=False)
+                    if not bucket:
+                        del buckets[lowest]
+                    del frequency[victim]
+            frequency[page] = count
+            bucket = buckets.get(count)
+            if bucket is None:
+                bucket = buckets[count] = OrderedDict()
+                heapq.heappush(bucket_heap, count)
+                if len(bucket_heap) > 4 * len(buckets) + 64:
+                    bucket_heap[:] = list(buckets)
+                    heapq.heapify(bucket_heap)
+            bucket[page] = None
+        return faults
+
+
+class OPTPolicy:
+    """
+    Belady's optimal replacement: evict the page whose next use is furthest
+    away. prepare(trace) gives it the complete future; without it each batch
+    is treated as the whole future (OPT with a one-batch lookahead).
+    """
+    def __init__(self, frames):
+        self.frames = frames
+        self.resident = {}  # page -> position of its next use
+        self.heap = []      # (-next use, page), with stale entries skipped lazily
+        self.future = None
+        self.position = 0
+
+    def prepare(self, trace):
+        self.future = next_use(np.asarray(trace, dtype=np.int64))
+        self.position = 0
+
+    def process(self, pages, counts, ends):
+        if self.future is not None:
+            uses = self.future[ends + self.position]
+            self.position += int(ends[-1]) + 1 if len(ends) else 0
+        else:
+            uses = next_use(np.repeat(pages, counts))[ends]
+        resident, heap, frames = self.resident, self.heap, self.frames
+        faults = 0
+        for page, use in zip(pages.tolist(), uses.tolist()):
+            if page not in resident:
+                faults += 1
+                if len(resident) >= frames:
+                    while True:
+                        negative_use, victim = heapq.heappop(heap)
+                        if resident.get(victim) == -negative_use:
+                            break
+                    del resident[victim]
+            resident[page] = use
+            heapq.heappush(heap, (-use, page))
+            if len(heap) > 4 * frames + 64:
+                # drop stale entries so the heap stays proportional to the frame count
+                heap[:] = [(-u, p) for p, u in resident.items()]
+                heapq.heapify(heap)
+        return faults
+
+
+POLICIES = {
+    'fifo': FIFOPolicy,
+    'lru': LRUPolicy,
+    'clock': ClockPolicy,
+    'lfu': LFUPolicy,
+    'opt': OPTPolicy,
+}
+
+
+# --------------------------
+# Paging metrics
+# Same shape as MemorySimulatorMetrics: plain counters plus derived rates.
+# --------------------------
+class PagingMetrics:
+    def __init__(self):
+        self.references = 0
+        self.page_faults = 0
+
+    def record(self, references, faults):
+        self.references += references
+        self.page_faults += faults
+
+    def get_page_hits(self):
+        return self.references - self.page_faults
+
+    def get_hit_rate(self):
+        return self.get_page_hits() / self.references if self.references > 0 else 0
+
+    def get_fault_rate(self):
+        return self.page_faults / self.references if self.references > 0 else 0
+
+
+# --------------------------
+# Paging Simulator
+# --------------------------
+def is_flat(pages):
+    """True for a single reference stream (a 1-D array or a sequence of page numbers) rather than chunks"""
+    if isinstance(pages, np.ndarray):
+        return pages.ndim == 1
+    # a plain list of ints is one stream; only sequences of arrays are chunks
+    return isinstance(pages, Sequence) and (len(pages) == 0 or np.ndim(pages[0]) == 0)
+
+
+def iter_slices(pages, size):
+    """Yields consecutive slices of at most `size` references from an array or an iterable of chunks"""
+    chunks = [pages] if is_flat(pages) else pages
+    for chunk in chunks:
+        if not isinstance(chunk, np.ndarray):
+            chunk = np.asarray(chunk)
+        # convert slice by slice, so a memmap of another dtype is never copied whole
+        for start in range(0, len(chunk), size):
+            yield np.asarray(chunk[start:start + size], dtype=np.int64)
+
+
+class PagingSimulator:
+    def __init__(self, frames, policy="lru"):
+        if frames <= 0:
+            raise ValueError("frames must be positive")
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r}; choose from {', '.join(POLICIES)}")
+        self.frames = frames
+        self.policy_name = policy
+        self.reset()
+
+    def reset(self):
+        self.policy = POLICIES[self.policy_name](self.frames)
+        self.metrics = PagingMetrics()
+        self.job_metrics = {}
+
+    def access(self, pages, job=None):
+        """Runs one batch of page references (global page ids) and returns its fault count"""
+        pages = np.asarray(pages, dtype=np.int64)
+        if len(pages) == 0:
+            return 0
+        faults = self.policy.process(*compress_runs(pages))
+        self.metrics.record(len(pages), faults)
+        if job is not None:
+            self.job_metrics.setdefault(job, PagingMetrics()).record(len(pages), faults)
+        return faults
+
+    def run_trace(self, pages, chunk_size=1 << 20):
+        """Runs a single reference stream (array, memmap or iterable of chunks) in chunks"""
+        batches = iter_slices(pages, chunk_size)
+        if self.policy_name == 'opt':
+            # OPT needs the whole trace up front
+            batches = list(batches)
+            self.policy.prepare(np.concatenate(batches) if batches else [])
+        for batch in batches:
+            self.access(batch)
+        return self.get_metrics()
+
+    def run_stream(self, stream, pages, chunk_size=1 << 20):
+        """Runs one job's references (local page numbers) over the shared frame pool"""
+        for batch in iter_slices(pages, chunk_size):
+            self.access(global_pages(stream, batch), job=stream)
+        return self.get_metrics()
+
+    def run_jobs(self, jobs, quantum=4096):
+        """
+        Interleaves jobs round-robin, `quantum` references at a time, over the
+        shared frame pool. Each job is a dict with 'stream' and 'pages' (an
+        array or an iterable of chunks of page numbers local to the job).
+        """
+        schedule = self.schedule(jobs, quantum)
+        if self.policy_name == 'opt':
+            # OPT needs the whole interleaved future up front
+            schedule = list(schedule)
+            self.policy.prepare(np.concatenate([batch for _, batch in schedule]) if schedule else [])
+        for stream, batch in schedule:
+            self.access(batch, job=stream)
+        return self.get_metrics()
+
+    def schedule(self, jobs, quantum):
+        active = deque((job['stream'], iter_slices(job['pages'], quantum)) for job in jobs)
+        while active:
+            stream, slices = active.popleft()
+            batch = next(slices, None)
+            if batch is None:
+                continue
+            yield stream, global_pages(stream, batch)
+            active.append((stream, slices))
+
+    # Frontend-friendly getters
+    def get_metrics(self):
+        return {
+            "policy": self.policy_name,
+            "frames": self.frames,
+            "references": self.metrics.references,
+            "page_faults": self.metrics.page_faults,
+            "page_hits": self.metrics.get_page_hits(),
+            "hit_rate": self.metrics.get_hit_rate(),
+            "fault_rate": self.metrics.get_fault_rate(),
+        }
+
+    def get_job_metrics(self):
+        return {
+            stream: {
+                "references": m.references,
+                "page_faults": m.page_faults,
+                "hit_rate": m.get_hit_rate(),
+            }
+            for stream, m in self.job_metrics.items()
+        }
+
+
+def synthetic_references(n, pages=1024, working_set=32, shift_probability=0.001, seed=None, chunk_size=1 << 20):
+    """
+    Yields chunks of a locality-heavy reference string: references fall inside
+    a working set of `working_set` pages that jumps to a new random base with
+    probability `shift_probability` per reference.
+    """
+    rng = np.random.default_rng(seed)
+    base = int(rng.integers(pages))
+    emitted = 0
+    while emitted < n:
+        size = min(chunk_size, n - emitted)
+        shifts = rng.random(size) < shift_probability
+        bases = rng.integers(pages, size=int(shifts.sum()) + 1)
+        bases[0] = base
+        current = bases[np.cumsum(shifts)]
+        base = int(current[-1])
+        yield (current + rng.integers(working_set, size=size)) % pages
+        emitted += size
@@ -0,0 +1,188 @@
+import os
+from collections import deque
+
+import numpy as np
+
+'''
+Retention policies for finished jobs.
+
+MemorySimulator hands every completed job to one of these stores. Running
+totals live in MemorySimulatorMetrics regardless of the policy, so the store
+only decides which job records (if any) stay resident:
+
+* KeepAll        - every record in a list (the original behaviour)
+* KeepRecent     - the last N records in a ring buffer
+* AggregateOnly  - no records, counters only
+* SpillToDisk    - records are batched and appended to per-column .npy files
+'''
+
+# column name -> dtype of the spilled record; missing fields are written as -1 / nan
+RECORD_COLUMNS = {
+    'stream': np.int64,
+    'size': np.int64,
+    'time': np.float64,
+    'arrival_time': np.float64,
+    'wait_time': np.float64,
+    'finish_time': np.float64,
+    'allocated_block': np.int64,
+}
+
+
+def _missing(dtype):
+    return -1 if np.issubdtype(dtype, np.integer) else np.nan
+
+
+# --------------------------
+# Append-only columnar writer
+# Each column is a .npy file <directory>/<name>.npy. The header has a fixed
+# size and is rewritten with the new row count on every flush, so the data can
+# be appended in batches and the file is always loadable (and memory-mappable)
+# with np.load.
+# --------------------------
+NPY_HEADER_SIZE = 128
+
+
+def npy_header(dtype, rows):
+    header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)})
+    # magic (6) + version (2) + header length (2) + padded dict ending in a newline
+    header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+class ColumnWriter:
+    def __init__(self, directory, columns, batch_size=65536):
+        self.directory = directory
+        self.columns = {name: np.dtype(dtype).newbyteorder('<') for name, dtype in columns.items()}
+        self.batch_size = batch_size
+        os.makedirs(directory, exist_ok=True)
+        self.truncate()
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def truncate(self):
+        for name, dtype in self.columns.items():
+            with open(self.path(name), 'wb') as f:
+                f.write(npy_header(dtype, 0))
+        self.rows = 0
+        self.buffered = 0
+        self.pending = {name: [] for name in self.columns}
+
+    def append(self, row):
+        for name, dtype in self.columns.items():
+            value = row.get(name)
+            self.pending[name].append(_missing(dtype) if value is None else value)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def append_columns(self, arrays):
+        """Writes whole column arrays (all the same length) straight to disk, after any buffered rows"""
+        self.flush()
+        self.write(arrays, len(next(iter(arrays.values()))))
+
+    def flush(self):
+        if self.buffered == 0:
+            return
+        self.write(self.pending, self.buffered)
+        self.pending = {name: [] for name in self.columns}
+        self.buffered = 0
+
+    def write(self, data, rows):
+        if rows == 0:
+            return
+        self.rows += rows
+        for name, dtype in self.columns.items():
+            with open(self.path(name), 'r+b') as f:
+                f.seek(0, os.SEEK_END)
+                np.asarray(data[name], dtype=dtype).tofile(f)
+                f.seek(0)
+                f.write(npy_header(dtype, self.rows))
+
+
+def load_columns(directory, columns=RECORD_COLUMNS):
+    """Loads the columns written by ColumnWriter as memory-mapped arrays"""
+    arrays = {}
+    for name in columns:
+        path = os.path.join(directory, f"{name}.npy")
+        # an empty column has no data to map
+        arrays[name] = np.load(path, mmap_mode=None if os.path.getsize(path) == NPY_HEADER_SIZE else 'r')
+    return arrays
+
+
+# --------------------------
+# Retention policies
+# --------------------------
+class KeepAll:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.records = []
+
+    def add(self, job):
+        self.records.append(job)
+
+    def jobs(self):
+        return self.records
+
+    def flush(self):
+        pass
+
+
+class KeepRecent:
+    def __init__(self, size=1000):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.records = deque(maxlen=self.size)
+
+    def add(self, job):
+        self.records.append(job)
+
+    def jobs(self):
+        return list(self.records)
+
+    def flush(self):
+        pass
+
+
+class AggregateOnly:
+    def reset(self):
+        pass
+
+    def add(self, job):
+        pass
+
+    def jobs(self):
+        return []
+
+    def flush(self):
+        pass
+
+
+class SpillToDisk:
+    """
+    Appends finished-job records to columnar files under `directory` in
+    batches of `batch_size`; only the unflushed batch is kept in memory.
+    Use load_columns(directory) to read a run back.
+    """
+    def __init__(self, directory, batch_size=65536):
+        self.directory = directory
+        self.writer = ColumnWriter(directory, RECORD_COLUMNS, batch_size)
+
+    def reset(self):
+        self.writer.truncate()
+
+    def add(self, job):
+        self.writer.append(job)
+
+    def jobs(self):
+        # records already on disk are not loaded back implicitly
+        return []
+
+    def flush(self):
+        self.writer.flush()
@@ -0,0 +1,276 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backend import MemorySimulator
+
+'''
+Out-of-process simulation for the GUI.
+
+The backend runs in its own process and publishes block, job and metric state
+into a multiprocessing.shared_memory segment guarded by a seqlock: the writer
+bumps a sequence counter to an odd value, writes, then bumps it to even again.
+The GUI maps the same segment as NumPy arrays (no copies, no pickling) and
+takes a consistent snapshot whenever it wants to repaint. Start/Pause/Step/
+Speed/Reset go to the simulation over a lightweight control pipe.
+
+Only job lists are supported (the GUI needs a fixed-size job table); use
+multipool or run_simulation directly for streamed workloads.
+'''
+
+JOB_STATUS = ['waiting', 'queued', 'running', 'completed']
+JOB_STATUS_CODE = {name: code for code, name in enumerate(JOB_STATUS)}
+
+
+def as_number(value):
+    # keep whole numbers as ints so the GUI shows "3" rather than "3.0"
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+# header slots
+TIME, THROUGHPUT, AVG_WAIT, FINISHED = range(4)
+COMPLETED, TOTAL, WAITING_SIZE, QUEUE_LENGTH = range(4)
+
+
+# --------------------------
+# Shared-memory layout
+# Every field is 8 bytes wide, so the arrays are laid out back to back.
+# --------------------------
+class SharedState:
+    def __init__(self, shm, n_blocks, n_jobs):
+        self.shm = shm
+        self.n_blocks = n_blocks
+        self.n_jobs = n_jobs
+        fields = [
+            ('seq', np.uint64, 1),
+            ('floats', np.float64, 4),
+            ('counters', np.int64, 4),
+            ('block_status', np.int64, n_blocks),  # 0 free, 1 occupied
+            ('block_job', np.int64, n_blocks),     # index into the job list, -1 when free
+            ('block_frag', np.int64, n_blocks),
+            ('job_status', np.int64, n_jobs),      # JOB_STATUS code
+            ('job_block', np.int64, n_jobs),       # block id, -1 when unallocated
+            ('job_wait', np.float64, n_jobs),
+            ('queue', np.int64, n_jobs),           # job indices, first QUEUE_LENGTH are valid
+        ]
+        offset = 0
+        self.arrays = {}
+        for name, dtype, count in fields:
+            self.arrays[name] = np.ndarray((count,), dtype=dtype, buffer=shm.buf, offset=offset)
+            offset += 8 * count
+
+    @staticmethod
+    def nbytes(n_blocks, n_jobs):
+        return 8 * (1 + 4 + 4 + 3 * n_blocks + 4 * n_jobs)
+
+    @classmethod
+    def create(cls, n_blocks, n_jobs):
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(n_blocks, n_jobs))
+        state = cls(shm, n_blocks, n_jobs)
+        for array in state.arrays.values():
+            array[:] = 0
+        return state
+
+    @classmethod
+    def attach(cls, name, n_blocks, n_jobs):
+        return cls(shared_memory.SharedMemory(name=name), n_blocks, n_jobs)
+
+    def write_begin(self):
+        self.arrays['seq'][0] += 1
+
+    def write_end(self):
+        self.arrays['seq'][0] += 1
+
+    def generation(self):
+        return int(self.arrays['seq'][0])
+
+    def snapshot(self):
+        """Consistent copy of every array, retrying while a write is in progress"""
+        seq = self.arrays['seq']
+        while True:
+            before = int(seq[0])
+            if before & 1:
+                time.sleep(0)
+                continue
+            copy = {name: array.copy() for name, array in self.arrays.items() if name != 'seq'}
+            if int(seq[0]) == before:
+                copy['generation'] = before
+                return copy
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+
+
+# --------------------------
+# Simulation process
+# --------------------------
+def publish(state, sim, job_index, finished):
+    a = state.arrays
+    metrics = sim.get_metrics()
+    waiting = sim.get_waiting_jobs()
+    state.write_begin()
+    a['floats'][:] = (sim.current_time, metrics['throughput'], metrics['avg_wait_time'], float(finished))
+    a['counters'][:] = (metrics['completed_jobs'], metrics['total_jobs'], metrics['waiting_queue_size'], len(waiting))
+    for i, block in enumerate(sim.get_memory_state()):
+        occupied = block['status'] == 'occupied'
+        a['block_status'][i] = occupied
+        a['block_job'][i] = job_index[id(block['job'])] if occupied else -1
+        a['block_frag'][i] = block['internal_fragmentation']
+    for i, job in enumerate(sim.get_jobs_state()):
+        a['job_status'][i] = JOB_STATUS_CODE.get(job['status'], 0)
+        a['job_block'][i] = job['allocated_block'] if job['allocated_block'] is not None else -1
+        a['job_wait'][i] = job.get('wait_time', 0)
+    for i, job in enumerate(waiting):
+        a['queue'][i] = job_index[id(job)]
+    state.write_end()
+
+
+def simulation_main(conn, shm_name, jobs, memory):
+    state = SharedState.attach(shm_name, len(memory), len(jobs))
+    sim = MemorySimulator(jobs, memory, step_delay=0, verbose=False)
+    job_index = {id(job): i for i, job in enumerate(sim.get_jobs_state())}
+    strategy = "first_fit"
+    speed = 1.0
+    running = False
+    next_step = 0.0
+    publish(state, sim, job_index, False)
+    while True:
+        timeout = max(0.0, next_step - time.monotonic()) if running else None
+        if conn.poll(timeout):
+            command, *args = conn.recv()
+            if command == 'start':
+                strategy, speed = args
+                running = True
+                next_step = time.monotonic()
+            elif command == 'pause':
+                running = False
+            elif command == 'speed':
+                speed = args[0]
+            elif command == 'step':
+                strategy = args[0]
+                sim.simulate_step(strategy)
+                publish(state, sim, job_index, sim.is_finished())
+            elif command == 'reset':
+                running = False
+                sim.reset_memory()
+                job_index = {id(job): i for i, job in enumerate(sim.get_jobs_state())}
+                publish(state, sim, job_index, False)
+            elif command == 'stop':
+                break
+            continue
+        # same pacing as SimulationWorker: one step every 1/speed seconds
+        sim.simulate_step(strategy)
+        finished = sim.is_finished()
+        publish(state, sim, job_index, finished)
+        running = not finished
+        next_step += 1.0 / speed
+    state.close()
+    conn.close()
+
+
+# --------------------------
+# GUI-side proxy
+# Exposes the MemorySimulator getters the GUI uses, answered from the latest
+# shared-memory snapshot. Call refresh() once per frame.
+# --------------------------
+class RemoteSimulator:
+    def __init__(self, jobs, memory):
+        self.original_jobs = [dict(job) for job in jobs]
+        self.original_memory = [dict(block) for block in memory]
+        self.state = SharedState.create(len(memory), len(jobs))
+        context = multiprocessing.get_context()
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=simulation_main,
+            args=(child, self.state.shm.name, self.original_jobs, self.original_memory),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.generation = -1
+        self.view = self.state.snapshot()
+        self.current_time = 0
+
+    # Controls (non-blocking)
+    def start(self, strategy, speed):
+        self.conn.send(('start', strategy, speed))
+
+    def pause(self):
+        self.conn.send(('pause',))
+
+    def set_speed(self, speed):
+        self.conn.send(('speed', speed))
+
+    def simulate_step(self, strategy="first_fit"):
+        self.conn.send(('step', strategy))
+
+    def reset_memory(self):
+        self.conn.send(('reset',))
+
+    def close(self):
+        if self.process.is_alive():
+            self.conn.send(('stop',))
+            self.process.join(timeout=2)
+        self.conn.close()
+        self.state.close()
+        self.state.shm.unlink()
+
+    # Snapshot handling
+    def refresh(self):
+        """Takes a new snapshot; returns False when nothing changed since the last one"""
+        if self.state.generation() == self.generation:
+            return False
+        self.view = self.state.snapshot()
+        self.generation = self.view['generation']
+        self.current_time = as_number(self.view['floats'][TIME])
+        return True
+
+    def is_finished(self):
+        return bool(self.view['floats'][FINISHED])
+
+    # Frontend-friendly getters (same shapes as MemorySimulator)
+    def job_state(self, i):
+        job = dict(self.original_jobs[i])
+        block = int(self.view['job_block'][i])
+        job['status'] = JOB_STATUS[self.view['job_status'][i]]
+        job['allocated_block'] = block if block >= 0 else None
+        job['wait_time'] = as_number(self.view['job_wait'][i])
+        return job
+
+    def get_memory_state(self):
+        blocks = []
+        for i, block in enumerate(self.original_memory):
+            occupied = bool(self.view['block_status'][i])
+            job = int(self.view['block_job'][i])
+            blocks.append({
+                'block': block['block'],
+                'size': block['size'],
+                'status': 'occupied' if occupied else 'free',
+                'job': self.job_state(job) if occupied else None,
+                'internal_fragmentation': int(self.view['block_frag'][i]),
+            })
+        return blocks
+
+    def get_jobs_state(self):
+        return [self.job_state(i) for i in range(len(self.original_jobs))]
+
+    def get_completed_jobs(self):
+        return [job for job in self.get_jobs_state() if job['status'] == 'completed']
+
+    def get_waiting_jobs(self):
+        length = int(self.view['counters'][QUEUE_LENGTH])
+        return [self.job_state(int(i)) for i in self.view['queue'][:length]]
+
+    def get_metrics(self):
+        floats, counters = self.view['floats'], self.view['counters']
+        return {
+            "throughput": float(floats[THROUGHPUT]),
+            "avg_wait_time": float(floats[AVG_WAIT]),
+            "waiting_queue_size": int(counters[WAITING_SIZE]),
+            "completed_jobs": int(counters[COMPLETED]),
+            "total_jobs": int(counters[TOTAL]),
+        }
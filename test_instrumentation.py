@@ -0,0 +1,54 @@
+import threading
+import time
+
+from backend import MemorySimulator
+
+
+def make_memory():
+    return [{'block': i, 'size': size, 'status': 'free', 'job': None, 'internal_fragmentation': 0}
+            for i, size in enumerate([9500, 7000, 4500, 3000], 1)]
+
+
+def make_jobs():
+    return [{'stream': i, 'time': 1 + i % 4, 'size': 1000 * (1 + i % 8)} for i in range(20)]
+
+
+def test_step_mode_records_profiler_samples():
+    sim = MemorySimulator(make_jobs(), make_memory(), step_delay=0.005, verbose=False)
+    sim.stats.enable()
+    profiler = sim.stats.enable_profiler(interval=0.001)
+    threads = threading.active_count()
+    sim.simulate_step()
+    sampler = profiler.thread
+    while not sim.is_finished():
+        # one sampling thread runs across steps instead of one per step
+        assert profiler.thread is sampler and sampler.is_alive()
+        sim.simulate_step()
+
+    assert sum(profiler.samples.values()) > 0
+    assert any('simulate_step' in stack for stack in profiler.samples)
+    # finalize() stopped the sampler
+    assert profiler.thread is None
+    assert threading.active_count() == threads
+
+
+def test_reset_stops_profiler():
+    sim = MemorySimulator(make_jobs(), make_memory(), step_delay=0, verbose=False)
+    profiler = sim.stats.enable_profiler(interval=0.001)
+    sim.simulate_step()
+    assert profiler.thread is not None
+    sim.reset_memory()
+    assert profiler.thread is None
+
+
+def test_events_per_second_excludes_pacing():
+    sim = MemorySimulator(make_jobs(), make_memory(), step_delay=0.005, verbose=False)
+    sim.stats.enable()
+    while not sim.is_finished():
+        sim.simulate_step()
+        time.sleep(0.002)  # the GUI's speed-slider pause between steps
+
+    stats = sim.get_engine_stats()
+    assert stats['counters']['events'] > 0
+    assert stats['engine_seconds'] < stats['phases']['pacing']['sum']
+    assert stats['events_per_second'] > 10 * stats['events_per_wall_second']
@@ -0,0 +1,35 @@
+import pytest
+
+from multipool import BestFitAcrossPools, LeastLoaded, MultiPoolSimulator, RoundRobin
+
+
+def block(number, size):
+    return {'block': number, 'size': size, 'status': 'free', 'job': None, 'internal_fragmentation': 0}
+
+
+LARGE_POOL = [block(1, 9000)]
+SMALL_POOL = [block(1, 1000), block(2, 1000)]
+
+
+def make_jobs():
+    return [
+        {'stream': 1, 'time': 5, 'size': 8000, 'arrival_time': 0},
+        {'stream': 2, 'time': 5, 'size': 500, 'arrival_time': 0},
+        {'stream': 3, 'time': 5, 'size': 8500, 'arrival_time': 1},
+        {'stream': 4, 'time': 5, 'size': 20000, 'arrival_time': 2},  # fits no pool
+        {'stream': 5, 'time': 5, 'size': 700, 'arrival_time': 3},
+    ]
+
+
+@pytest.mark.parametrize('policy', [RoundRobin, LeastLoaded, BestFitAcrossPools])
+def test_jobs_only_go_to_pools_that_can_hold_them(policy):
+    sim = MultiPoolSimulator(make_jobs(), [SMALL_POOL, LARGE_POOL], policy=policy(), epoch=1, processes=False)
+    metrics = sim.run()
+
+    # the oversized job is rejected; every other job completes instead of
+    # waiting forever in the small pool
+    assert metrics['aggregate']['rejected_jobs'] == 1
+    assert metrics['aggregate']['total_jobs'] == 4
+    assert metrics['aggregate']['completed_jobs'] == 4
+    assert metrics['aggregate']['queue'] == 0
+    assert metrics['pools'][1]['completed_jobs'] >= 2
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from backend import MemorySimulator
+from paging import POLICIES, PagingSimulator, iter_slices
+
+
+@pytest.mark.parametrize('policy', list(POLICIES))
+def test_non_int64_memmap_runs_in_slices(tmp_path, policy):
+    trace = np.random.default_rng(1).integers(0, 40, 5000).astype(np.int32)
+    np.save(tmp_path / 'trace.npy', trace)
+    pages = np.load(tmp_path / 'trace.npy', mmap_mode='r')
+
+    slices = list(iter_slices(pages, 1000))
+    assert [len(s) for s in slices] == [1000] * 5
+    assert all(s.dtype == np.int64 for s in slices)
+    # each slice is a converted copy of its own range, not a view of a whole-trace copy
+    assert all(s.base is None or s.base.size == 1000 for s in slices)
+
+    expected = PagingSimulator(8, policy).run_trace(trace.astype(np.int64))
+    assert PagingSimulator(8, policy).run_trace(pages, chunk_size=1000) == expected
+
+
+@pytest.mark.parametrize('pages', [[0, 1, -1], [0, 1 << 32]])
+def test_out_of_range_pages_are_rejected(pages):
+    with pytest.raises(ValueError):
+        PagingSimulator(4).run_jobs([{'stream': 1, 'pages': np.array(pages)}])
+
+
+def test_memory_simulator_reports_paging_metrics():
+    memory = [{'block': 1, 'size': 5000, 'status': 'free', 'job': None, 'internal_fragmentation': 0}]
+    jobs = [
+        {'stream': 1, 'time': 2, 'size': 1000, 'pages': np.array([0, 1, 2, 0, 1, 2])},
+        {'stream': 2, 'time': 1, 'size': 2000, 'pages': [5, 5, 6]},
+        {'stream': 3, 'time': 1, 'size': 500},
+    ]
+    sim = MemorySimulator(jobs, memory, step_delay=0, verbose=False, paging=PagingSimulator(frames=8))
+    sim.run_simulation('first_fit')
+
+    paging = sim.get_metrics()['paging']
+    assert paging['references'] == 9
+    assert paging['page_faults'] == 5
+    assert set(sim.paging.get_job_metrics()) == {1, 2}
+
+    sim.reset_memory()
+    assert sim.get_metrics()['paging']['references'] == 0
@@ -0,0 +1,292 @@
+import numpy as np
+
+'''
+Synthetic workload generator for the memory simulator.
+
+Jobs are sampled with NumPy in chunks and emitted lazily, so a workload of
+millions of jobs can be fed straight into MemorySimulator without building a
+list first. Every iteration over a WorkloadGenerator starts again from its
+seed, which keeps runs reproducible and lets the simulator reset cleanly.
+'''
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+# --------------------------
+# Arrival processes
+# Each process yields arrays of `chunk_size` increasing arrival times forever.
+# Any state (e.g. the current MMPP phase) lives in the generator, so two
+# iterations never share it.
+# --------------------------
+class PoissonArrivals:
+    def __init__(self, rate=1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+
+    def times(self, rng, chunk_size):
+        now = 0.0
+        while True:
+            arrivals = now + np.cumsum(rng.exponential(1.0 / self.rate, chunk_size))
+            now = arrivals[-1]
+            yield arrivals
+
+
+class BurstyArrivals:
+    """
+    Markov-modulated Poisson process (MMPP). The process sits in a phase for an
+    exponential sojourn, arriving at that phase's rate, then jumps to another
+    phase according to `transitions` (defaults to cycling through the phases).
+    """
+    def __init__(self, rates=(0.5, 5.0), mean_sojourn=(20.0, 5.0), transitions=None):
+        self.rates = np.asarray(rates, dtype=float)
+        self.mean_sojourn = np.asarray(mean_sojourn, dtype=float)
+        if self.rates.shape != self.mean_sojourn.shape or self.rates.ndim != 1:
+            raise ValueError("rates and mean_sojourn must be 1-D and the same length")
+        if np.any(self.rates < 0) or np.any(self.mean_sojourn <= 0):
+            raise ValueError("rates must be >= 0 and mean_sojourn > 0")
+        if not np.any(self.rates > 0):
+            raise ValueError("at least one phase needs a positive rate")
+        n = len(self.rates)
+        if transitions is None:
+            transitions = np.roll(np.eye(n), 1, axis=1) if n > 1 else np.ones((1, 1))
+        self.transitions = np.asarray(transitions, dtype=float)
+        if self.transitions.shape != (n, n):
+            raise ValueError("transitions must be an n x n matrix")
+        self.transitions = self.transitions / self.transitions.sum(axis=1, keepdims=True)
+
+    def phases(self, rng, start, count):
+        # the phase sequence is a short sequential walk; arrivals are vectorized
+        phases = np.empty(count, dtype=np.intp)
+        cumulative = np.cumsum(self.transitions, axis=1)
+        draws = rng.random(count)
+        phase = start
+        for i in range(count):
+            phases[i] = phase
+            phase = min(int(np.searchsorted(cumulative[phase], draws[i], side='right')), len(self.rates) - 1)
+        return phases, phase
+
+    def times(self, rng, chunk_size):
+        now = 0.0
+        phase = 0
+        pending = np.empty(0)
+        mean_rate = max(float(np.mean(self.rates * self.mean_sojourn) / np.mean(self.mean_sojourn)), 1e-9)
+        while True:
+            while len(pending) < chunk_size:
+                # enough sojourns to cover the rest of the chunk on average
+                segments = max(16, int((chunk_size - len(pending)) / (mean_rate * np.mean(self.mean_sojourn))) + 1)
+                seg_phases, phase = self.phases(rng, phase, segments)
+                lengths = rng.exponential(self.mean_sojourn[seg_phases])
+                starts = now + np.concatenate(([0.0], np.cumsum(lengths[:-1])))
+                now = starts[-1] + lengths[-1]
+                # given the count in a sojourn, Poisson arrivals are uniform over it
+                counts = rng.poisson(self.rates[seg_phases] * lengths)
+                offsets = rng.random(counts.sum()) * np.repeat(lengths, counts)
+                arrivals = np.sort(np.repeat(starts, counts) + offsets)
+                pending = np.concatenate((pending, arrivals))
+            yield pending[:chunk_size]
+            pending = pending[chunk_size:]
+
+
+class DiurnalArrivals:
+    """
+    Non-homogeneous Poisson process with a sinusoidal daily cycle:
+    rate(t) = base_rate * (1 + amplitude * sin(2*pi*t/period + phase)).
+    Sampled by thinning a homogeneous process at the peak rate.
+    """
+    def __init__(self, base_rate=1.0, amplitude=0.8, period=1440.0, phase=0.0):
+        if base_rate <= 0 or period <= 0:
+            raise ValueError("base_rate and period must be positive")
+        if not 0 <= amplitude <= 1:
+            raise ValueError("amplitude must be between 0 and 1")
+        self.base_rate = base_rate
+        self.amplitude = amplitude
+        self.period = period
+        self.phase = phase
+
+    def rate(self, t):
+        return self.base_rate * (1 + self.amplitude * np.sin(2 * np.pi * t / self.period + self.phase))
+
+    def times(self, rng, chunk_size):
+        now = 0.0
+        peak = self.base_rate * (1 + self.amplitude)
+        pending = np.empty(0)
+        while True:
+            while len(pending) < chunk_size:
+                candidates = now + np.cumsum(rng.exponential(1.0 / peak, chunk_size))
+                now = candidates[-1]
+                keep = rng.random(chunk_size) * peak < self.rate(candidates)
+                pending = np.concatenate((pending, candidates[keep]))
+            yield pending[:chunk_size]
+            pending = pending[chunk_size:]
+
+
+# --------------------------
+# Size and duration distributions
+# sample(rng, n) returns n positive values; the generator rounds them to ints.
+# --------------------------
+class Distribution:
+    def sample(self, rng, n):
+        raise NotImplementedError
+
+    def sample_for(self, rng, sizes):
+        """Durations may depend on job sizes; plain distributions ignore them"""
+        return self.sample(rng, len(sizes))
+
+
+class Constant(Distribution):
+    def __init__(self, value):
+        self.value = value
+
+    def sample(self, rng, n):
+        return np.full(n, self.value, dtype=float)
+
+
+class Uniform(Distribution):
+    def __init__(self, low, high):
+        if low > high:
+            raise ValueError("low must not exceed high")
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+
+class LogNormal(Distribution):
+    """Parameterised by the median and the sigma of the underlying normal"""
+    def __init__(self, median, sigma):
+        if median <= 0 or sigma < 0:
+            raise ValueError("median must be positive and sigma non-negative")
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self, rng, n):
+        return rng.lognormal(np.log(self.median), self.sigma, n)
+
+
+class Pareto(Distribution):
+    """Heavy-tailed sizes: P(X > x) = (minimum / x) ** alpha for x >= minimum"""
+    def __init__(self, alpha, minimum):
+        if alpha <= 0 or minimum <= 0:
+            raise ValueError("alpha and minimum must be positive")
+        self.alpha = alpha
+        self.minimum = minimum
+
+    def sample(self, rng, n):
+        return self.minimum * (1 + rng.pareto(self.alpha, n))
+
+
+class Bimodal(Distribution):
+    """Mixture of a small and a large mode, picked with probability p_large"""
+    def __init__(self, small, large, p_large=0.2):
+        if not 0 <= p_large <= 1:
+            raise ValueError("p_large must be between 0 and 1")
+        self.small = small
+        self.large = large
+        self.p_large = p_large
+
+    def sample(self, rng, n):
+        pick_large = rng.random(n) < self.p_large
+        values = self.small.sample(rng, n)
+        values[pick_large] = self.large.sample(rng, int(pick_large.sum()))
+        return values
+
+
+class Empirical(Distribution):
+    """Resamples (with replacement) from values observed in a trace"""
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        if self.values.size == 0:
+            raise ValueError("empirical distribution needs at least one value")
+
+    @classmethod
+    def from_jobs(cls, jobs, key='size'):
+        return cls([job[key] for job in jobs])
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads a .npy array or a whitespace/comma separated text column"""
+        if str(path).endswith('.npy'):
+            return cls(np.load(path))
+        return cls(np.loadtxt(path, delimiter=',' if str(path).endswith('.csv') else None, ndmin=1))
+
+    def sample(self, rng, n):
+        return rng.choice(self.values, n)
+
+
+class SizeScaledDuration(Distribution):
+    """Duration grows with job size: time = size / rate * noise"""
+    def __init__(self, rate, noise=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.noise = noise if noise is not None else Constant(1.0)
+
+    def sample(self, rng, n):
+        raise ValueError("SizeScaledDuration needs job sizes; use sample_for")
+
+    def sample_for(self, rng, sizes):
+        return sizes / self.rate * self.noise.sample(rng, len(sizes))
+
+
+# --------------------------
+# Workload generator
+# --------------------------
+class WorkloadGenerator:
+    """
+    Produces a job stream in the same shape as ORIGINAL_JOBS:
+    {'stream', 'time', 'size', 'arrival_time'}.
+
+    Iterating the generator yields job dicts one at a time; chunks() yields the
+    underlying column arrays for callers that want to stay vectorized. Pass
+    n_jobs=None for an endless stream.
+    """
+    def __init__(self, n_jobs=None, arrivals=None, sizes=None, durations=None, seed=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, min_size=1, max_size=None, min_time=1):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.n_jobs = n_jobs
+        self.arrivals = arrivals if arrivals is not None else PoissonArrivals(1.0)
+        self.sizes = sizes if sizes is not None else Uniform(100, 10000)
+        self.durations = durations if durations is not None else Uniform(1, 10)
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_time = min_time
+
+    def chunks(self):
+        """Yields dicts of equal-length NumPy columns, at most chunk_size rows each"""
+        rng = np.random.default_rng(self.seed)
+        arrival_times = self.arrivals.times(rng, self.chunk_size)
+        emitted = 0
+        while self.n_jobs is None or emitted < self.n_jobs:
+            n = self.chunk_size if self.n_jobs is None else min(self.chunk_size, self.n_jobs - emitted)
+            arrival = next(arrival_times)[:n]
+            sizes = np.rint(self.sizes.sample(rng, n))
+            sizes = np.clip(sizes, self.min_size, self.max_size).astype(np.int64)
+            times = np.rint(self.durations.sample_for(rng, sizes.astype(float)))
+            times = np.maximum(times, self.min_time).astype(np.int64)
+            yield {
+                'stream': np.arange(emitted + 1, emitted + n + 1, dtype=np.int64),
+                'time': times,
+                'size': sizes,
+                'arrival_time': arrival,
+            }
+            emitted += n
+
+    def jobs(self):
+        for chunk in self.chunks():
+            # tolist() converts whole columns at once instead of per element
+            columns = [chunk[key].tolist() for key in ('stream', 'time', 'size', 'arrival_time')]
+            for stream, duration, size, arrival in zip(*columns):
+                yield {'stream': stream, 'time': duration, 'size': size, 'arrival_time': arrival}
+
+    def __iter__(self):
+        return self.jobs()
+
+    def __len__(self):
+        if self.n_jobs is None:
+            raise TypeError("endless workload has no length")
+        return self.n_jobs